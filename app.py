@@ -1,20 +1,223 @@
-from flask import Flask, render_template, request, redirect, url_for, session
+from flask import (Flask, current_app, render_template, request, redirect, url_for, session, jsonify,
+                   send_from_directory)
 import sqlite3
 import csv
 import io
+import os
+import queue
 
-# Flask 앱 생성 및 세션 키 설정
-app = Flask(__name__)
-app.secret_key = 'your-secret-key-here-change-this-in-production'
+from hotkeys import HotKeyCache, AdmissionController, Overloaded
+from snapshots import SnapshotPublisher
+
+
+# =========================
+# 기본 설정값 (create_app(config)로 덮어쓸 수 있음)
+# =========================
+# 개발 서버(python app.py) 전용 키. 세션 쿠키에 is_admin이 들어가므로 운영에서 쓰면 안 된다.
+DEV_SECRET_KEY = 'your-secret-key-here-change-this-in-production'
+
+DEFAULT_CONFIG = {
+    # 운영 환경에서는 반드시 PLAYLIST_SECRET_KEY 환경변수로 지정 (없으면 create_app()이 실패)
+    'SECRET_KEY': os.environ.get('PLAYLIST_SECRET_KEY'),
+    'DATABASE': os.environ.get('PLAYLIST_DATABASE', 'database/playlist.db'),
+    'DB_TIMEOUT': 5,
+    # 프로세스(워커)마다 유지할 SQLite 연결 수
+    'DB_POOL_SIZE': 4,
+    # 연결마다 캐시할 준비된 SQL 문 개수 (sqlite3 cached_statements)
+    'STATEMENT_CACHE_SIZE': 128,
+    # SQLite 페이지 캐시 크기 (PRAGMA cache_size, 음수면 KiB 단위)
+    'SQLITE_CACHE_SIZE': -8000,
+    # 트래픽을 받기 전에 warm_up()을 실행할지 여부
+    'WARM_UP': True,
+    # pre-fork 마스터에서 로드할 때 True: 템플릿만 컴파일하고 연결은 열지 않는다.
+    # (연결 워밍업은 워커의 post_fork에서) gunicorn.conf.py가 PLAYLIST_PRELOAD=1을 설정한다.
+    'PRELOAD': os.environ.get('PLAYLIST_PRELOAD') == '1',
+    # 플레이리스트 상세 조회 캐시 (hot key 보호, 초 단위)
+    'HOT_CACHE_ENABLED': True,
+    'HOT_CACHE_SIZE': 256,
+    'HOT_CACHE_TTL': 2.0,
+    # TTL이 지난 뒤에도 이 시간 동안은 이전 값을 주고 백그라운드에서 갱신
+    # 캐시는 워커(프로세스)마다 따로 있고 무효화도 수정을 처리한 워커에서만 일어나므로,
+    # 다른 워커에서는 최대 TTL + STALE_TTL 동안 이전 내용이 보일 수 있다.
+    'HOT_CACHE_STALE_TTL': 3.0,
+    # 캐시 미스 시 동시에 DB를 조회할 수 있는 수 / 대기열 길이 / 대기 시간
+    'ADMISSION_MAX_INFLIGHT': 4,
+    'ADMISSION_MAX_QUEUE': 64,
+    'ADMISSION_QUEUE_TIMEOUT': 2.0,
+    # 공개 페이지 정적 스냅샷 저장 위치 (None이면 만들지 않음)
+    'SNAPSHOT_DIR': os.environ.get('PLAYLIST_SNAPSHOT_DIR'),
+    # 비로그인 방문자에게 스냅샷 파일을 그대로 응답할지 여부
+    'SERVE_SNAPSHOTS': False,
+}
+
+
+# =========================
+# 라우트 등록용 데코레이터
+# - 뷰 함수는 모듈 로드 시 목록에만 쌓아두고,
+#   create_app()에서 앱마다 등록한다. (엔드포인트 이름은 함수 이름 그대로)
+# =========================
+_routes = []
+
+def route(rule, **options):
+    def decorator(view_func):
+        _routes.append((rule, view_func, options))
+        return view_func
+    return decorator
+
+
+# =========================
+# 자주 쓰는 조회 쿼리
+# - sqlite3 문장 캐시는 SQL 문자열 기준이므로,
+#   warm_up()과 실제 라우트가 같은 문자열을 쓰도록 상수로 둔다.
+# =========================
+INDEX_SQL = """
+    SELECT 
+        p.playlist_id,
+        p.user_id,
+        p.title,
+        p.description,
+        p.created_at,
+        p.cover_url,
+        u.username,
+        COALESCE(
+            p.cover_url,
+            (
+                SELECT s.cover_url
+                FROM playlist_songs ps
+                JOIN songs s ON ps.song_id = s.song_id
+                WHERE ps.playlist_id = p.playlist_id
+                  AND s.cover_url IS NOT NULL
+                LIMIT 1
+            )
+        ) AS display_cover_url
+    FROM playlists p
+    LEFT JOIN users u ON p.user_id = u.user_id
+    ORDER BY p.playlist_id DESC
+"""
+
+PLAYLIST_SQL = """
+    SELECT p.playlist_id,
+           p.user_id,
+           p.title,
+           p.description,
+           p.created_at,
+           p.cover_url,
+           u.username
+    FROM playlists p
+    LEFT JOIN users u ON p.user_id = u.user_id
+    WHERE p.playlist_id = ?
+"""
+
+PLAYLIST_SONGS_SQL = """
+    SELECT 
+        s.song_id,
+        s.title,
+        s.artist,
+        s.album,
+        s.cover_url,
+        ps.track_order
+    FROM playlist_songs ps
+    JOIN songs s ON ps.song_id = s.song_id
+    WHERE ps.playlist_id = ?
+    ORDER BY ps.track_order
+"""
+
+SEARCH_SONGS_SQL = """
+    SELECT song_id, title, artist, album, cover_url
+    FROM songs
+    WHERE title  LIKE ?
+       OR artist LIKE ?
+       OR album  LIKE ?
+    ORDER BY title
+"""
+
+ALL_SONGS_SQL = """
+    SELECT song_id, title, artist, album, cover_url
+    FROM songs
+    ORDER BY title
+"""
+
+
+# =========================
+# DB 연결 풀
+# - conn.close()를 호출하면 실제로 닫지 않고 풀에 반납한다.
+# - pre-fork 서버(--preload)에서 fork 이후에는 부모가 연 연결을 버리고 새로 연다.
+# =========================
+class PooledConnection:
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._raw is not None:
+            self._pool.release(self._raw)
+            self._raw = None
+
+
+class ConnectionPool:
+    def __init__(self, database, size=4, timeout=5,
+                 cached_statements=128, cache_size=-8000):
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.cache_size = cache_size
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._pid = os.getpid()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database,
+                               timeout=self.timeout,
+                               cached_statements=self.cached_statements,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        return conn
+
+    def _reset_after_fork(self):
+        # 안전장치: fork 전에 close_all()을 하지 못했다면 부모 연결은 건드리지 않고 버린다.
+        if self._pid != os.getpid():
+            self._idle = queue.LifoQueue(maxsize=self.size)
+            self._pid = os.getpid()
+
+    def acquire(self):
+        self._reset_after_fork()
+        try:
+            raw = self._idle.get_nowait()
+        except queue.Empty:
+            raw = self._connect()
+        return PooledConnection(self, raw)
+
+    def release(self, raw):
+        if self._pid != os.getpid():
+            return
+        if raw.in_transaction:
+            raw.rollback()
+        try:
+            self._idle.put_nowait(raw)
+        except queue.Full:
+            raw.close()
+
+    def close_all(self):
+        """
+        유휴 연결을 모두 닫는다. pre-fork 서버의 마스터에서 fork 전에 호출.
+        """
+        while True:
+            try:
+                raw = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            raw.close()
 
 
 # =========================
 # DB 연결 함수
 # =========================
 def get_db_connection():
-    conn = sqlite3.connect('database/playlist.db', timeout=5)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return current_app.extensions['db_pool'].acquire()
 
 
 # =========================
@@ -47,26 +250,128 @@ def ensure_guardrails():
 # =========================
 # 공통 헬퍼 함수들
 # =========================
+def invalidate_playlists(playlist_ids=None):
+    """
+    플레이리스트 내용이 바뀐 뒤 호출 (커밋 이후).
+    상세 조회 캐시를 비우고 정적 스냅샷을 다시 만든다.
+    playlist_ids가 None이면 전체를 무효화한다.
+    """
+    cache = current_app.extensions['hot_cache']
+    if playlist_ids is None:
+        cache.invalidate()
+    else:
+        for pid in playlist_ids:
+            cache.invalidate(pid)
+    refresh_snapshots(playlist_ids)
+
+
+def refresh_snapshots(playlist_ids=None):
+    """
+    publish_snapshots()를 실행하되 실패해도 예외를 올리지 않는다.
+    (이미 커밋된 저장 요청이 500이 되지 않도록)
+    실패하면 dirty 표시를 남겨서 다음 게시 때 전체를 다시 만든다.
+    """
+    publisher = current_app.extensions.get('snapshots')
+    if publisher is None:
+        return
+    try:
+        publish_snapshots(playlist_ids)
+    except Exception:
+        current_app.logger.exception('스냅샷 게시 실패 (다음 게시 때 전체 재생성)')
+        publisher.mark_dirty()
+
+
+def publish_snapshots(playlist_ids=None):
+    """
+    비로그인 방문자 기준으로 상세 페이지와 메인 목록을 정적 파일로 렌더링.
+    playlist_ids가 None이면 모든 플레이리스트를 다시 만들고,
+    삭제된 플레이리스트의 스냅샷은 지운다.
+    """
+    publisher = current_app.extensions.get('snapshots')
+    if publisher is None:
+        return
+
+    # 워커 간 잠금 안에서 DB를 읽어야, 나중에 커밋된 내용을 먼저 쓴 파일을
+    # 늦게 끝난 이전 게시가 덮어쓰는 일이 없다.
+    with publisher.lock():
+        # 이전 게시가 실패했다면 일부만이 아니라 전체를 다시 만든다.
+        if playlist_ids is not None and publisher.is_dirty():
+            playlist_ids = None
+        full = playlist_ids is None
+
+        conn = get_db_connection()
+        cur = conn.cursor()
+        playlists = fetch_index_playlists(cur)
+        conn.close()
+
+        if full:
+            playlist_ids = [row['playlist_id'] for row in playlists]
+            stale_ids = set(publisher.playlist_ids()) - set(playlist_ids)
+            for pid in stale_ids:
+                publisher.remove(publisher.playlist_name(pid))
+
+        # 세션이 비어 있는 요청 컨텍스트에서 렌더링 (로그인 전용 메뉴/버튼 제외)
+        with current_app.test_request_context('/'):
+            for pid in playlist_ids:
+                data = load_playlist_view(pid)
+                if data is None:
+                    publisher.remove(publisher.playlist_name(pid))
+                else:
+                    publisher.write(publisher.playlist_name(pid),
+                                    render_template('view_playlist.html', **data))
+            publisher.write(publisher.INDEX,
+                            render_template('index.html', playlists=playlists))
+
+        if full:
+            publisher.clear_dirty()
+
+
+def serve_snapshot(name):
+    """
+    SERVE_SNAPSHOTS 모드에서 비로그인 방문자에게는 스냅샷 파일을 그대로 응답.
+    로그인 상태이거나 스냅샷이 없으면 None (동적 렌더링으로 진행)
+    """
+    publisher = current_app.extensions.get('snapshots')
+    if publisher is None or not current_app.config['SERVE_SNAPSHOTS']:
+        return None
+    if session.get('user_id') or session.get('is_admin'):
+        return None
+    if not publisher.exists(name):
+        return None
+    return send_from_directory(publisher.root, name)
+
+
+def fetch_index_playlists(cur):
+    """
+    메인 페이지 플레이리스트 목록 (최신순, 표시용 커버 포함)
+    """
+    cur.execute(INDEX_SQL)
+    return cur.fetchall()
+
+
+def playlists_with_songs(cur, song_ids):
+    """
+    주어진 곡들이 들어 있는 플레이리스트 id 목록
+    """
+    if not song_ids:
+        return []
+    placeholders = ','.join('?' * len(song_ids))
+    cur.execute(f"""
+        SELECT DISTINCT playlist_id
+        FROM playlist_songs
+        WHERE song_id IN ({placeholders})
+    """, list(song_ids))
+    return [row['playlist_id'] for row in cur.fetchall()]
+
 def search_songs(cur, query):
     """
     곡 검색(또는 전체 목록) 공통 함수
     """
     query = (query or '').strip()
     if query:
-        cur.execute("""
-            SELECT song_id, title, artist, album, cover_url
-            FROM songs
-            WHERE title  LIKE ?
-               OR artist LIKE ?
-               OR album  LIKE ?
-            ORDER BY title
-        """, (f'%{query}%', f'%{query}%', f'%{query}%'))
+        cur.execute(SEARCH_SONGS_SQL, (f'%{query}%', f'%{query}%', f'%{query}%'))
     else:
-        cur.execute("""
-            SELECT song_id, title, artist, album, cover_url
-            FROM songs
-            ORDER BY title
-        """)
+        cur.execute(ALL_SONGS_SQL)
     return cur.fetchall()
 
 def get_songs_by_ids(cur, ids):
@@ -220,6 +525,7 @@ def handle_playlist_form(mode='create', playlist_id=None):
                     VALUES (?, ?, ?, datetime('now'), ?)
                 """, (user_id, title, description, cover_url))
                 new_playlist_id = cur.lastrowid
+                saved_playlist_id = new_playlist_id
 
                 # [FIX] UPSERT로 안전 삽입(중복오면 track_order 갱신)
                 for order, song_id in enumerate(selected_song_ids, start=1):
@@ -245,6 +551,8 @@ def handle_playlist_form(mode='create', playlist_id=None):
                     WHERE playlist_id = ?
                 """, (title, description, cover_url, playlist_id))
 
+                saved_playlist_id = playlist_id
+
                 # 기존 곡 구성 초기화 후 업서트
                 cur.execute("DELETE FROM playlist_songs WHERE playlist_id = ?", (playlist_id,))
                 for order, song_id in enumerate(selected_song_ids, start=1):
@@ -257,6 +565,7 @@ def handle_playlist_form(mode='create', playlist_id=None):
 
             conn.commit()
             conn.close()
+            invalidate_playlists([saved_playlist_id])
             return redirect(url_for('index'))
 
     # ---------- GET 요청: 초기 진입 ----------
@@ -282,35 +591,15 @@ def handle_playlist_form(mode='create', playlist_id=None):
 # =========================
 # 메인 페이지: 플레이리스트 목록
 # =========================
-@app.route('/')
+@route('/')
 def index():
+    snapshot = serve_snapshot(SnapshotPublisher.INDEX)
+    if snapshot is not None:
+        return snapshot
+
     conn = get_db_connection()
     cur = conn.cursor()
-    cur.execute("""
-        SELECT 
-            p.playlist_id,
-            p.user_id,
-            p.title,
-            p.description,
-            p.created_at,
-            p.cover_url,
-            u.username,
-            COALESCE(
-                p.cover_url,
-                (
-                    SELECT s.cover_url
-                    FROM playlist_songs ps
-                    JOIN songs s ON ps.song_id = s.song_id
-                    WHERE ps.playlist_id = p.playlist_id
-                      AND s.cover_url IS NOT NULL
-                    LIMIT 1
-                )
-            ) AS display_cover_url
-        FROM playlists p
-        LEFT JOIN users u ON p.user_id = u.user_id
-        ORDER BY p.playlist_id DESC
-    """)
-    playlists = cur.fetchall()
+    playlists = fetch_index_playlists(cur)
     conn.close()
     return render_template('index.html', playlists=playlists)
 
@@ -318,7 +607,7 @@ def index():
 # =========================
 # 로그인 / 회원가입
 # =========================
-@app.route('/login', methods=['GET', 'POST'])
+@route('/login', methods=['GET', 'POST'])
 def login():
     conn = get_db_connection()
     cur = conn.cursor()
@@ -386,7 +675,7 @@ def login():
 
 
 # 로그아웃
-@app.route('/logout')
+@route('/logout')
 def logout():
     session.pop('user_id', None)
     session.pop('username', None)
@@ -399,56 +688,34 @@ def logout():
 # =========================
 
 # 새 플레이리스트
-@app.route('/playlists/new', methods=['GET', 'POST'])
+@route('/playlists/new', methods=['GET', 'POST'])
 def create_playlist():
     return handle_playlist_form(mode='create')
 
 
 # 플레이리스트 수정
-@app.route('/playlists/edit/<int:playlist_id>', methods=['GET', 'POST'])
+@route('/playlists/edit/<int:playlist_id>', methods=['GET', 'POST'])
 def edit_playlist(playlist_id):
     return handle_playlist_form(mode='edit', playlist_id=playlist_id)
 
 
-# 플레이리스트 상세 페이지 (수록곡 포함)
-@app.route('/playlists/<int:playlist_id>')
-def view_playlist(playlist_id):
+def load_playlist_view(playlist_id):
+    """
+    상세 페이지 렌더링에 필요한 데이터 조회 (플레이리스트가 없으면 None)
+    """
     conn = get_db_connection()
     cur = conn.cursor()
 
     # 플레이리스트 정보 (cover_url 포함)
-    cur.execute("""
-        SELECT p.playlist_id,
-               p.user_id,
-               p.title,
-               p.description,
-               p.created_at,
-               p.cover_url,
-               u.username
-        FROM playlists p
-        LEFT JOIN users u ON p.user_id = u.user_id
-        WHERE p.playlist_id = ?
-    """, (playlist_id,))
+    cur.execute(PLAYLIST_SQL, (playlist_id,))
     playlist = cur.fetchone()
 
     if not playlist:
         conn.close()
-        return "플레이리스트를 찾을 수 없습니다.", 404
+        return None
 
     # 플레이리스트에 포함된 곡 목록 (중복 없어야 하지만 정렬 포함)
-    cur.execute("""
-        SELECT 
-            s.song_id,
-            s.title,
-            s.artist,
-            s.album,
-            s.cover_url,
-            ps.track_order
-        FROM playlist_songs ps
-        JOIN songs s ON ps.song_id = s.song_id
-        WHERE ps.playlist_id = ?
-        ORDER BY ps.track_order
-    """, (playlist_id,))
+    cur.execute(PLAYLIST_SONGS_SQL, (playlist_id,))
     songs = cur.fetchall()
 
     # 표시용 cover_url (플레이리스트 커버가 없으면 곡 커버 중 하나 사용)
@@ -460,14 +727,59 @@ def view_playlist(playlist_id):
                 break
 
     conn.close()
-    return render_template('view_playlist.html',
-                           playlist=playlist,
-                           songs=songs,
-                           display_cover_url=display_cover_url)
+    return {'playlist': playlist,
+            'songs': songs,
+            'display_cover_url': display_cover_url}
+
+
+def bypass_hot_cache(cache, playlist_id):
+    """
+    캐시를 거치지 않고 DB에서 바로 읽어야 하는 요청인지 판단.
+    캐시와 무효화는 워커마다 따로라서, 다른 워커에서 방금 수정했을 수 있는
+    관리자와 플레이리스트 주인은 항상 최신 내용을 봐야 한다.
+    로그인 사용자는 캐시에 든 값으로 주인이 아님을 확인할 수 있을 때만 캐시를 쓴다.
+    """
+    if session.get('is_admin'):
+        return True
+    user_id = session.get('user_id')
+    if not user_id:
+        return False
+    cached = cache.peek(playlist_id)
+    return cached is None or cached['playlist']['user_id'] == user_id
+
+
+# 플레이리스트 상세 페이지 (수록곡 포함)
+@route('/playlists/<int:playlist_id>')
+def view_playlist(playlist_id):
+    snapshot = serve_snapshot(SnapshotPublisher.playlist_name(playlist_id))
+    if snapshot is not None:
+        return snapshot
+
+    cache = current_app.extensions['hot_cache']
+    if not current_app.config['HOT_CACHE_ENABLED'] or bypass_hot_cache(cache, playlist_id):
+        data = load_playlist_view(playlist_id)
+    else:
+        # 같은 플레이리스트에 몰리는 동시 요청은 한 번의 조회 결과를 공유한다.
+        # (백그라운드 갱신 스레드에서도 돌 수 있으므로 앱 컨텍스트를 직접 연다)
+        app = current_app._get_current_object()
+
+        def load():
+            with app.app_context():
+                return load_playlist_view(playlist_id)
+
+        try:
+            data = cache.get(playlist_id, load)
+        except Overloaded:
+            return "요청이 많아 잠시 후 다시 시도해주세요.", 503, {'Retry-After': '1'}
+
+    if data is None:
+        return "플레이리스트를 찾을 수 없습니다.", 404
+
+    return render_template('view_playlist.html', **data)
 
 
 # 플레이리스트 삭제 (본인 또는 관리자만)
-@app.route('/playlists/delete/<int:playlist_id>', methods=['POST'])
+@route('/playlists/delete/<int:playlist_id>', methods=['POST'])
 def delete_playlist(playlist_id):
     is_admin = session.get('is_admin')
     current_user_id = session.get('user_id')
@@ -496,13 +808,14 @@ def delete_playlist(playlist_id):
 
     conn.commit()
     conn.close()
+    invalidate_playlists([playlist_id])
     return redirect(url_for('index'))
 
 
 # =========================
 # 노래 관리 (관리자 전용)
 # =========================
-@app.route('/songs', methods=['GET'])
+@route('/songs', methods=['GET'])
 def manage_songs():
     if not session.get('is_admin'):
         return redirect(url_for('login'))
@@ -537,7 +850,7 @@ def manage_songs():
 
 
 # 노래 한 곡 추가 (관리자 전용)
-@app.route('/songs/add', methods=['POST'])
+@route('/songs/add', methods=['POST'])
 def add_song():
     if not session.get('is_admin'):
         return redirect(url_for('login'))
@@ -563,7 +876,7 @@ def add_song():
 
 
 # CSV로 여러 곡 업로드 (관리자 전용)
-@app.route('/songs/upload', methods=['POST'])
+@route('/songs/upload', methods=['POST'])
 def upload_songs_csv():
     if not session.get('is_admin'):
         return redirect(url_for('login'))
@@ -598,7 +911,7 @@ def upload_songs_csv():
     return redirect(url_for('manage_songs'))
 
 
-@app.route('/songs/bulk', methods=['POST'])
+@route('/songs/bulk', methods=['POST'])
 def songs_bulk_action():
     if not session.get('is_admin'):
         return redirect(url_for('login'))
@@ -614,10 +927,12 @@ def songs_bulk_action():
     if action == 'delete_selected':
         selected_ids = request.form.getlist('selected_ids')
         if selected_ids:
+            affected_ids = playlists_with_songs(cur, selected_ids)
             for sid in selected_ids:
                 cur.execute("DELETE FROM playlist_songs WHERE song_id = ?", (sid,))
                 cur.execute("DELETE FROM songs WHERE song_id = ?", (sid,))
             conn.commit()
+            invalidate_playlists(affected_ids)
         conn.close()
         return redirect(url_for('manage_songs'))
 
@@ -635,16 +950,18 @@ def songs_bulk_action():
             SET title = ?, artist = ?, album = ?, cover_url = ?
             WHERE song_id = ?
         """, (title, artist, album, cover_url, song_id))
+        affected_ids = playlists_with_songs(cur, [song_id])
 
         conn.commit()
         conn.close()
+        invalidate_playlists(affected_ids)
         return redirect(url_for('manage_songs'))
 
     conn.close()
     return redirect(url_for('manage_songs'))
 
 
-@app.route('/songs/update/<int:song_id>', methods=['POST'])
+@route('/songs/update/<int:song_id>', methods=['POST'])
 def update_song(song_id):
     """
     노래 정보 수정 (관리자 전용)
@@ -665,15 +982,17 @@ def update_song(song_id):
         SET title = ?, artist = ?, album = ?, cover_url = ?
         WHERE song_id = ?
     """, (title, artist, album, cover_url, song_id))
+    affected_ids = playlists_with_songs(cur, [song_id])
 
     conn.commit()
     conn.close()
+    invalidate_playlists(affected_ids)
 
     return redirect(url_for('manage_songs'))
 
 
 # 노래 한 곡 삭제 (관리자 전용)
-@app.route('/songs/delete/<int:song_id>', methods=['POST'])
+@route('/songs/delete/<int:song_id>', methods=['POST'])
 def delete_song(song_id):
     if not session.get('is_admin'):
         return redirect(url_for('login'))
@@ -681,16 +1000,18 @@ def delete_song(song_id):
     conn = get_db_connection()
     cur = conn.cursor()
 
+    affected_ids = playlists_with_songs(cur, [song_id])
     cur.execute("DELETE FROM playlist_songs WHERE song_id = ?", (song_id,))
     cur.execute("DELETE FROM songs WHERE song_id = ?", (song_id,))
 
     conn.commit()
     conn.close()
+    invalidate_playlists(affected_ids)
     return redirect(url_for('manage_songs'))
 
 
 # 모든 노래 삭제 (관리자 전용)
-@app.route('/songs/delete_all', methods=['POST'])
+@route('/songs/delete_all', methods=['POST'])
 def delete_all_songs():
     if not session.get('is_admin'):
         return redirect(url_for('login'))
@@ -703,11 +1024,12 @@ def delete_all_songs():
 
     conn.commit()
     conn.close()
+    invalidate_playlists()
     return redirect(url_for('manage_songs'))
 
 
 # DB 테이블 목록 확인 (개발용)
-@app.route('/test-db')
+@route('/test-db')
 def test_db():
     conn = get_db_connection()
     cur = conn.cursor()
@@ -717,7 +1039,117 @@ def test_db():
     return f"현재 데이터베이스에 존재하는 테이블: {tables}"
 
 
-if __name__ == '__main__':
+# 상세 조회 캐시 / 입장 제어 지표 (개발·모니터링용)
+@route('/metrics/hot')
+def hot_metrics():
+    return jsonify(current_app.extensions['hot_cache'].stats())
+
+
+def rebuild_snapshots_command():
+    """
+    모든 정적 스냅샷을 다시 만든다. (게시 실패나 DB 직접 수정 이후)
+
+        PLAYLIST_SECRET_KEY=... PLAYLIST_SNAPSHOT_DIR=... flask --app app rebuild-snapshots
+    """
+    if current_app.extensions.get('snapshots') is None:
+        raise RuntimeError('SNAPSHOT_DIR이 설정되지 않았습니다.')
+    publish_snapshots()
+
+
+# =========================
+# 워밍업: 트래픽을 받기 전에 한 번 실행
+# =========================
+def warm_up(app, connections=True):
+    """
+    모든 Jinja 템플릿을 미리 컴파일하고, connections가 True면
+    연결 풀을 채워 각 연결의 문장 캐시/페이지 캐시까지 데운다.
+    pre-fork 서버에서는 마스터에서 connections=False로,
+    워커마다(fork 이후) 다시 호출해서 연결을 데운다.
+    """
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+
+    if not connections:
+        return
+
+    with app.app_context():
+        pool = app.extensions['db_pool']
+        conns = [pool.acquire() for _ in range(pool.size)]
+        try:
+            for conn in conns:
+                cur = conn.cursor()
+                # 메인 목록 / 곡 검색 쿼리 (songs 테이블과 인덱스 페이지까지 읽힘)
+                cur.execute(INDEX_SQL).fetchall()
+                cur.execute(ALL_SONGS_SQL).fetchall()
+                cur.execute(SEARCH_SONGS_SQL, ('%%', '%%', '%%')).fetchall()
+                # 상세 페이지 쿼리 (없는 id여도 준비된 문장은 캐시에 남는다)
+                cur.execute(PLAYLIST_SQL, (0,)).fetchall()
+                cur.execute(PLAYLIST_SONGS_SQL, (0,)).fetchall()
+        finally:
+            for conn in conns:
+                conn.close()
+
+
+# =========================
+# 앱 팩토리
+# =========================
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.from_mapping(DEFAULT_CONFIG)
+    if config:
+        app.config.from_mapping(config)
+    if not app.config['SECRET_KEY']:
+        raise RuntimeError('PLAYLIST_SECRET_KEY 환경변수(또는 SECRET_KEY 설정)가 필요합니다.')
+    app.secret_key = app.config['SECRET_KEY']
+
+    app.extensions['db_pool'] = ConnectionPool(
+        app.config['DATABASE'],
+        size=app.config['DB_POOL_SIZE'],
+        timeout=app.config['DB_TIMEOUT'],
+        cached_statements=app.config['STATEMENT_CACHE_SIZE'],
+        cache_size=app.config['SQLITE_CACHE_SIZE'],
+    )
+    app.extensions['hot_cache'] = HotKeyCache(
+        size=app.config['HOT_CACHE_SIZE'],
+        ttl=app.config['HOT_CACHE_TTL'],
+        stale_ttl=app.config['HOT_CACHE_STALE_TTL'],
+        admission=AdmissionController(
+            max_inflight=app.config['ADMISSION_MAX_INFLIGHT'],
+            max_queue=app.config['ADMISSION_MAX_QUEUE'],
+            queue_timeout=app.config['ADMISSION_QUEUE_TIMEOUT'],
+        ),
+    )
+
+    if app.config['SNAPSHOT_DIR']:
+        app.extensions['snapshots'] = SnapshotPublisher(app.config['SNAPSHOT_DIR'])
+
+    for rule, view_func, options in _routes:
+        app.add_url_rule(rule, view_func=view_func, **options)
+
     # [FIX] 서버 시작 시 중복 정리 & UNIQUE 인덱스 보강
-    ensure_guardrails()
-    app.run(debug=True)
+    with app.app_context():
+        ensure_guardrails()
+        # 첫 배포처럼 스냅샷이 아직 없거나, 이전 게시가 실패한 채로 재시작했다면 전체를 만든다.
+        # (서버 밖에서 DB를 바꿨다면 flask rebuild-snapshots 로 다시 만든다)
+        publisher = app.extensions.get('snapshots')
+        if publisher is not None and (not publisher.exists(publisher.INDEX)
+                                      or publisher.is_dirty()):
+            refresh_snapshots()
+
+    app.cli.command('rebuild-snapshots')(rebuild_snapshots_command)
+
+    if app.config['PRELOAD']:
+        # 마스터가 연 연결(가드레일/스냅샷)은 워커에 물려주지 않는다.
+        app.extensions['db_pool'].close_all()
+
+    if app.config['WARM_UP']:
+        warm_up(app, connections=not app.config['PRELOAD'])
+
+    return app
+
+
+if __name__ == '__main__':
+    # 개발 서버에서만 환경변수가 없으면 개발용 키를 쓴다.
+    create_app({
+        'SECRET_KEY': os.environ.get('PLAYLIST_SECRET_KEY') or DEV_SECRET_KEY,
+    }).run(debug=True)
@@ -0,0 +1,115 @@
+"""
+인기 플레이리스트 동시 조회 부하 테스트 (스레드 기반 로컬 부하 생성기)
+
+    python bench_hot_playlist.py [--threads 64] [--requests 50]
+
+DB 사본을 임시 폴더에 만들어 두고, 여러 스레드가 같은 /playlists/<id>를
+동시에 요청한다. 한 스레드는 주기적으로 해당 플레이리스트를 수정(쓰기 잠금)해서
+실제 서비스의 수정 트래픽을 흉내 낸다.
+- off: HOT_CACHE_ENABLED=False (요청마다 DB 조회, 기존 동작)
+- on : single-flight + hot-key 캐시 + 입장 제어
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from app import create_app, DEV_SECRET_KEY
+
+
+def run(mode, db_path, playlist_id, threads, requests_per_thread):
+    app = create_app({
+        'SECRET_KEY': DEV_SECRET_KEY,
+        'DATABASE': db_path,
+        'HOT_CACHE_ENABLED': mode == 'on',
+        # DB 잠금 오류를 500 응답으로 바꾸지 않고 그대로 올려서 따로 센다.
+        'PROPAGATE_EXCEPTIONS': True,
+    })
+    statuses = {}
+    latencies = []
+    lock = threading.Lock()
+    start = threading.Barrier(threads + 1)
+    stop_writer = threading.Event()
+
+    def reader():
+        client = app.test_client()
+        local = []
+        start.wait()
+        for _ in range(requests_per_thread):
+            t0 = time.perf_counter()
+            try:
+                status = client.get(f'/playlists/{playlist_id}').status_code
+            except sqlite3.OperationalError:
+                # 잠금 대기(timeout) 초과 등
+                status = 'db-error'
+            local.append(time.perf_counter() - t0)
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(local)
+
+    def writer():
+        conn = sqlite3.connect(db_path, timeout=5)
+        n = 0
+        while not stop_writer.wait(0.05):
+            n += 1
+            conn.execute("UPDATE playlists SET description = ? WHERE playlist_id = ?",
+                         (f'bench edit {n}', playlist_id))
+            conn.commit()
+            with app.app_context():
+                app.extensions['hot_cache'].invalidate(playlist_id)
+        conn.close()
+
+    workers = [threading.Thread(target=reader) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    w_thread = threading.Thread(target=writer)
+    w_thread.start()
+
+    start.wait()
+    t0 = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+    stop_writer.set()
+    w_thread.join()
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"[{mode}] {total} requests in {elapsed:.2f}s "
+          f"({total / elapsed:.0f} req/s), "
+          f"p50 {latencies[total // 2] * 1000:.1f}ms, "
+          f"p99 {latencies[int(total * 0.99) - 1] * 1000:.1f}ms")
+    print(f"[{mode}] status: {statuses}")
+    if mode == 'on':
+        print(f"[{mode}] metrics: {app.extensions['hot_cache'].stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(tmpdir, 'playlist.db')
+        shutil.copy('database/playlist.db', db_path)
+        conn = sqlite3.connect(db_path)
+        playlist_id = conn.execute(
+            "SELECT playlist_id FROM playlist_songs "
+            "GROUP BY playlist_id ORDER BY COUNT(*) DESC LIMIT 1"
+        ).fetchone()[0]
+        conn.close()
+
+        for mode in ('off', 'on'):
+            run(mode, db_path, playlist_id, args.threads, args.requests)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
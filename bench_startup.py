@@ -0,0 +1,60 @@
+"""
+시작 직후 첫 요청 지연시간 측정 (cold vs warm)
+
+    python bench_startup.py
+
+모드마다 새 파이썬 프로세스를 띄워서
+- cold: WARM_UP=False 로 앱 생성 후 바로 첫 요청
+- warm: WARM_UP=True  로 앱 생성(워밍업 포함) 후 첫 요청
+의 create_app() 소요시간과 첫 요청 지연시간을 비교한다.
+"""
+import json
+import subprocess
+import sys
+import time
+
+RUNS = 5
+
+
+def measure(mode):
+    from app import create_app, DEV_SECRET_KEY
+
+    t0 = time.perf_counter()
+    app = create_app({'SECRET_KEY': DEV_SECRET_KEY, 'WARM_UP': mode == 'warm'})
+    startup = time.perf_counter() - t0
+
+    with app.app_context():
+        conn = app.extensions['db_pool'].acquire()
+        row = conn.execute("SELECT MAX(playlist_id) AS pid FROM playlists").fetchone()
+        conn.close()
+    playlist_id = row['pid'] or 1
+
+    client = app.test_client()
+    result = {'startup_ms': startup * 1000}
+    for name, url in (('index', '/'), ('view_playlist', f'/playlists/{playlist_id}')):
+        t0 = time.perf_counter()
+        client.get(url)
+        result[f'{name}_first_ms'] = (time.perf_counter() - t0) * 1000
+    return result
+
+
+def main():
+    summary = {}
+    for mode in ('cold', 'warm'):
+        runs = []
+        for _ in range(RUNS):
+            out = subprocess.run([sys.executable, __file__, '--child', mode],
+                                 check=True, capture_output=True, text=True).stdout
+            runs.append(json.loads(out.strip().splitlines()[-1]))
+        summary[mode] = {k: sorted(r[k] for r in runs)[RUNS // 2] for k in runs[0]}
+
+    print(f"{'':24}{'cold':>10}{'warm':>10}   (median of {RUNS} runs, ms)")
+    for key in summary['cold']:
+        print(f"{key:24}{summary['cold'][key]:10.2f}{summary['warm'][key]:10.2f}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        print(json.dumps(measure(sys.argv[2])))
+    else:
+        main()
@@ -0,0 +1,24 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+import os
+
+bind = os.environ.get('PLAYLIST_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('PLAYLIST_WORKERS', '4'))
+threads = int(os.environ.get('PLAYLIST_THREADS', '2'))
+
+# 마스터에서 앱을 한 번만 로드하고 워커는 fork로 공유
+preload_app = True
+# 마스터에서는 연결을 열지 않도록 create_app()에 알린다. (워커는 post_fork에서 워밍업)
+os.environ['PLAYLIST_PRELOAD'] = '1'
+
+
+def pre_fork(server, worker):
+    # 마스터에 남은 SQLite 연결이 자식에게 복사되지 않도록 fork 전에 닫는다.
+    from wsgi import app
+    app.extensions['db_pool'].close_all()
+
+
+def post_fork(server, worker):
+    # 워커마다 자기 연결을 새로 열고 문장 캐시를 데운다.
+    from app import warm_up
+    from wsgi import app
+    warm_up(app)
@@ -0,0 +1,251 @@
+"""
+인기 플레이리스트(hot key) 보호용 캐시
+
+- SingleFlight: 같은 키에 대한 동시 조회는 하나의 계산 결과를 공유
+- AdmissionController: DB를 동시에 두드리는 조회 수 제한 (초과분은 대기 후 거절)
+- HotKeyCache: 짧은 TTL + stale-while-revalidate 캐시 (위 두 가지를 묶어서 사용)
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class Overloaded(Exception):
+    """
+    동시 조회 한도를 넘어 요청을 처리하지 않고 돌려보낼 때 발생
+    """
+
+
+# =========================
+# Single-flight: 같은 키 동시 조회 합치기
+# =========================
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        key에 대해 진행 중인 계산이 있으면 그 결과를 기다려 공유하고,
+        없으면 직접 fn()을 실행한다. (결과, 공유 여부)를 돌려준다.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+# =========================
+# 입장 제어: 동시 실행 수 제한 + 대기열
+# =========================
+class AdmissionController:
+    def __init__(self, max_inflight=4, max_queue=64, queue_timeout=2.0):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self.metrics = {'admitted': 0, 'queued': 0, 'shed': 0}
+
+    def __enter__(self):
+        # 바로 들어갈 수 있으면 대기열을 거치지 않는다.
+        if self._slots.acquire(blocking=False):
+            self._count('admitted')
+            return self
+
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                self.metrics['shed'] += 1
+                raise Overloaded('admission queue is full')
+            self._waiting += 1
+            self.metrics['queued'] += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        if not acquired:
+            self._count('shed')
+            raise Overloaded('timed out waiting for an admission slot')
+        self._count('admitted')
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+        return False
+
+    def _count(self, name):
+        with self._lock:
+            self.metrics[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.metrics, waiting=self._waiting)
+
+
+# =========================
+# Hot-key 캐시 (TTL + stale-while-revalidate)
+# =========================
+class HotKeyCache:
+    """
+    - ttl 안의 값은 그대로 반환 (hit)
+    - ttl은 지났지만 stale_ttl 안이면 이전 값을 반환하고 백그라운드에서 갱신 (stale)
+    - 그 외에는 single-flight + 입장 제어를 거쳐 직접 로드 (miss)
+    - 로드 결과가 None(없는 키)이면 저장하지 않는다.
+    """
+
+    def __init__(self, size=256, ttl=2.0, stale_ttl=3.0, admission=None):
+        self.size = size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.admission = admission or AdmissionController()
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (value, stored_at)
+        # invalidate() 이전에 시작된 로드 결과가 다시 저장되지 않도록 세대 번호를 둔다.
+        # 키마다 따로 세므로 다른 키를 무효화해도 진행 중인 로드/합치기에는 영향이 없다.
+        # (invalidate()로 전체를 비울 때만 _epoch를 올린다)
+        # 세대 번호는 로드가 진행 중인 키에 대해서만 들고 있는다.
+        self._epoch = 0
+        self._generations = {}
+        self._inflight = {}   # key -> 진행 중인 로드 수
+        self._refreshing = set()
+        self.metrics = {'hits': 0, 'stale_hits': 0, 'misses': 0,
+                        'coalesced': 0, 'loads': 0, 'refresh_errors': 0}
+
+    def get(self, key, load):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.metrics['hits'] += 1
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.metrics['stale_hits'] += 1
+                    self._refresh_in_background(key, load, generation)
+                    return value
+            self.metrics['misses'] += 1
+
+        value, shared = self._flight.do((key, generation),
+                                        lambda: self._load(key, load, generation))
+        if shared:
+            self._count('coalesced')
+        return value
+
+    def peek(self, key):
+        """
+        저장된 값을 그대로 돌려준다 (만료 여부/지표/갱신과 무관, 없으면 None).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def invalidate(self, key=None):
+        """
+        key가 없으면 전체를 비운다.
+        """
+        with self._lock:
+            if key is None:
+                self._epoch += 1
+                self._generations.clear()
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+                if key in self._inflight:
+                    self._generations[key] = self._generations.get(key, 0) + 1
+                else:
+                    # 진행 중인 로드가 없으면 이후 로드는 모두 무효화 뒤에 시작된다.
+                    self._generations.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.metrics, entries=len(self._entries))
+        stats['admission'] = self.admission.stats()
+        return stats
+
+    def _load(self, key, load, generation):
+        with self._lock:
+            self._inflight[key] = self._inflight.get(key, 0) + 1
+        value = None
+        loaded = False
+        try:
+            with self.admission:
+                value = load()
+            loaded = True
+        finally:
+            with self._lock:
+                if loaded:
+                    self.metrics['loads'] += 1
+                    if value is not None and generation == self._generation(key):
+                        self._entries[key] = (value, time.monotonic())
+                        self._entries.move_to_end(key)
+                        while len(self._entries) > self.size:
+                            self._entries.popitem(last=False)
+                self._inflight[key] -= 1
+                if not self._inflight[key]:
+                    del self._inflight[key]
+                    self._generations.pop(key, None)
+        return value
+
+    def _refresh_in_background(self, key, load, generation):
+        # self._lock을 잡은 상태에서 호출된다. 키마다 갱신 스레드는 하나만.
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._flight.do((key, generation),
+                                lambda: self._load(key, load, generation))
+            except Exception:
+                # 갱신에 실패해도 이전 값은 stale_ttl 동안 계속 쓴다.
+                self._count('refresh_errors')
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _generation(self, key):
+        # self._lock을 잡은 상태에서 호출된다.
+        return (self._epoch, self._generations.get(key, 0))
+
+    def _count(self, name):
+        with self._lock:
+            self.metrics[name] += 1
@@ -0,0 +1,102 @@
+"""
+공개 플레이리스트 정적 스냅샷 저장소
+
+렌더링된 HTML을 디렉터리에 파일로 저장해 두면 nginx 같은 웹 서버가
+Python/SQLite를 거치지 않고 바로 응답할 수 있다.
+
+    <root>/index.html              메인 목록
+    <root>/playlists/<id>.html     플레이리스트 상세
+
+파일은 같은 디렉터리의 임시 파일에 쓴 뒤 os.replace()로 교체하므로,
+읽는 쪽은 항상 이전 버전 또는 새 버전 전체만 보게 된다.
+게시 순서는 <root>/.publish.lock 에 대한 flock으로 워커(프로세스) 간에 맞춘다.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+class SnapshotPublisher:
+    INDEX = 'index.html'
+    LOCK = '.publish.lock'
+    # 게시가 실패했다는 표시. 다음 게시 때 전체를 다시 만든다.
+    DIRTY = '.dirty'
+
+    def __init__(self, root):
+        self.root = root
+        self._dirty = False
+        os.makedirs(os.path.join(root, 'playlists'), exist_ok=True)
+
+    @contextmanager
+    def lock(self):
+        """
+        게시 전체(DB 읽기 ~ 파일 교체)를 다른 스레드/워커와 겹치지 않게 한다.
+        """
+        # 유닉스 전용 모듈이라 스냅샷을 쓸 때만 불러온다. (기본 개발 환경은 OS 무관)
+        import fcntl
+
+        with open(self.path(self.LOCK), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def mark_dirty(self):
+        # 디스크 문제로 표시 파일을 못 만들어도 이 프로세스에서는 기억해 둔다.
+        self._dirty = True
+        try:
+            open(self.path(self.DIRTY), 'w').close()
+        except OSError:
+            pass
+
+    def is_dirty(self):
+        return self._dirty or os.path.exists(self.path(self.DIRTY))
+
+    def clear_dirty(self):
+        self._dirty = False
+        self.remove(self.DIRTY)
+
+    @staticmethod
+    def playlist_name(playlist_id):
+        return f'playlists/{int(playlist_id)}.html'
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def exists(self, name):
+        return os.path.isfile(self.path(name))
+
+    def write(self, name, html):
+        path = self.path(name)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                        prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(html)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp는 0600으로 만들기 때문에 웹 서버가 읽을 수 있게 바꿔준다.
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def remove(self, name):
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def playlist_ids(self):
+        """
+        현재 스냅샷이 있는 플레이리스트 id 목록
+        """
+        ids = []
+        for filename in os.listdir(os.path.join(self.root, 'playlists')):
+            stem, ext = os.path.splitext(filename)
+            if ext == '.html' and stem.isdigit():
+                ids.append(int(stem))
+        return ids
@@ -0,0 +1,125 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from app import DEV_SECRET_KEY, ConnectionPool, create_app, warm_up
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / 'playlist.db'
+    shutil.copy(os.path.join(ROOT, 'database', 'playlist.db'), path)
+    return str(path)
+
+
+def count_connects(monkeypatch, pool):
+    opened = []
+    original = pool._connect
+
+    def connect():
+        conn = original()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(pool, '_connect', connect)
+    return opened
+
+
+def test_acquire_after_fork_drops_inherited_connections(db_path):
+    pool = ConnectionPool(db_path, size=2)
+    conn = pool.acquire()
+    inherited = conn._raw
+    conn.close()
+    assert pool._idle.qsize() == 1
+
+    # fork 된 자식처럼 pid가 바뀐 상황
+    pool._pid = -1
+    conn = pool.acquire()
+    assert conn._raw is not inherited
+    assert pool._idle.qsize() == 0
+    conn.close()
+
+
+def test_release_rolls_back_open_transaction(db_path):
+    pool = ConnectionPool(db_path, size=1)
+    conn = pool.acquire()
+    conn.execute("INSERT INTO songs (title) VALUES ('uncommitted')")
+    assert conn.in_transaction
+    conn.close()
+
+    conn = pool.acquire()
+    assert not conn.in_transaction
+    row = conn.execute("SELECT COUNT(*) AS n FROM songs WHERE title = 'uncommitted'").fetchone()
+    assert row['n'] == 0
+    conn.close()
+
+
+def test_create_app_requires_secret_key(db_path):
+    with pytest.raises(RuntimeError):
+        create_app({'SECRET_KEY': None, 'DATABASE': db_path})
+
+
+def test_warm_up_without_connections_opens_none(db_path, monkeypatch):
+    app = create_app({'SECRET_KEY': DEV_SECRET_KEY, 'DATABASE': db_path, 'WARM_UP': False})
+    pool = app.extensions['db_pool']
+    opened = count_connects(monkeypatch, pool)
+    idle = pool._idle.qsize()
+
+    warm_up(app, connections=False)
+    assert opened == []
+    assert pool._idle.qsize() == idle
+
+    warm_up(app)
+    assert pool._idle.qsize() == pool.size
+
+
+def test_preload_leaves_no_idle_connections(db_path):
+    app = create_app({'SECRET_KEY': DEV_SECRET_KEY, 'DATABASE': db_path, 'PRELOAD': True})
+    assert app.extensions['db_pool']._idle.qsize() == 0
+
+
+def test_owner_sees_playlist_created_on_another_worker(db_path):
+    config = {'SECRET_KEY': DEV_SECRET_KEY, 'DATABASE': db_path, 'WARM_UP': False}
+    worker_a = create_app(config)
+    worker_b = create_app(config)
+
+    conn = sqlite3.connect(db_path)
+    user_id = conn.execute("SELECT user_id FROM users LIMIT 1").fetchone()[0]
+    next_id = conn.execute(
+        "SELECT seq + 1 FROM sqlite_sequence WHERE name = 'playlists'").fetchone()[0]
+    conn.close()
+
+    anon_b = worker_b.test_client()
+    assert anon_b.get(f'/playlists/{next_id}').status_code == 404
+
+    owner_a = worker_a.test_client()
+    owner_b = worker_b.test_client()
+    for client in (owner_a, owner_b):
+        with client.session_transaction() as s:
+            s['user_id'] = user_id
+    r = owner_a.post('/playlists/new', data={'action': 'save', 'title': 'NEW', 'description': 'd'})
+    assert r.status_code == 302
+
+    assert owner_b.get(f'/playlists/{next_id}').status_code == 200
+    assert anon_b.get(f'/playlists/{next_id}').status_code == 200
+
+
+def test_owner_bypasses_admission_control(db_path):
+    app = create_app({'SECRET_KEY': DEV_SECRET_KEY, 'DATABASE': db_path, 'WARM_UP': False,
+                      'ADMISSION_MAX_INFLIGHT': 1, 'ADMISSION_MAX_QUEUE': 0})
+    conn = sqlite3.connect(db_path)
+    playlist_id, user_id = conn.execute(
+        "SELECT playlist_id, user_id FROM playlists LIMIT 1").fetchone()
+    conn.close()
+
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s['user_id'] = user_id
+    # 캐시 미스 DB 조회 자리를 모두 차지한 상태
+    with app.extensions['hot_cache'].admission:
+        assert client.get(f'/playlists/{playlist_id}').status_code == 200
+        assert app.test_client().get(f'/playlists/{playlist_id}').status_code == 503
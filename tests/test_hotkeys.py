@@ -0,0 +1,184 @@
+import threading
+import time
+
+import pytest
+
+from hotkeys import AdmissionController, HotKeyCache, Overloaded, SingleFlight
+
+
+def wait_until(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not met in time')
+        time.sleep(0.001)
+
+
+class BlockingLoader:
+    """
+    release()가 호출될 때까지 막혀 있는 로더 (호출 횟수 기록)
+    """
+
+    def __init__(self, value='v'):
+        self.value = value
+        self.calls = 0
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.gate.wait(5)
+        return self.value
+
+    def release(self):
+        self.gate.set()
+
+
+def start(fn, *args):
+    t = threading.Thread(target=fn, args=args)
+    t.start()
+    return t
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    load = BlockingLoader()
+    results = []
+    threads = [start(lambda: results.append(flight.do('k', load))) for _ in range(8)]
+
+    wait_until(lambda: 'k' in flight._calls and flight._calls['k'].waiters == 7)
+    load.release()
+    for t in threads:
+        t.join()
+
+    assert load.calls == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert all(value == 'v' for value, _ in results)
+
+
+def test_cache_coalesces_concurrent_misses():
+    cache = HotKeyCache(ttl=60)
+    load = BlockingLoader()
+    threads = [start(cache.get, 'A', load) for _ in range(10)]
+
+    wait_until(lambda: cache._flight._calls and
+               next(iter(cache._flight._calls.values())).waiters == 9)
+    load.release()
+    for t in threads:
+        t.join()
+
+    stats = cache.stats()
+    assert load.calls == 1
+    assert stats['loads'] == 1
+    assert stats['coalesced'] == 9
+
+
+def test_invalidating_other_key_keeps_coalescing():
+    cache = HotKeyCache(ttl=60)
+    load = BlockingLoader()
+    first = start(cache.get, 'A', load)
+    assert load.started.wait(5)
+
+    cache.invalidate('B')
+    second = start(cache.get, 'A', load)
+    wait_until(lambda: next(iter(cache._flight._calls.values())).waiters == 1)
+    load.release()
+    first.join()
+    second.join()
+
+    stats = cache.stats()
+    assert stats['loads'] == 1
+    assert stats['coalesced'] == 1
+    # 다른 키 무효화 때문에 A의 결과가 버려지면 안 된다.
+    assert stats['entries'] == 1
+
+
+@pytest.mark.parametrize('key', ['A', None])
+def test_no_store_after_invalidate(key):
+    cache = HotKeyCache(ttl=60)
+    load = BlockingLoader('old')
+    t = start(cache.get, 'A', load)
+    assert load.started.wait(5)
+
+    cache.invalidate(key)
+    load.release()
+    t.join()
+
+    assert cache.stats()['entries'] == 0
+    assert cache.get('A', lambda: 'new') == 'new'
+
+
+def test_admission_sheds_when_queue_is_full():
+    admission = AdmissionController(max_inflight=1, max_queue=1, queue_timeout=5)
+    holder_in = threading.Event()
+    holder_out = threading.Event()
+
+    def holder():
+        with admission:
+            holder_in.set()
+            assert holder_out.wait(5)
+
+    def queued():
+        with admission:
+            pass
+
+    t1 = start(holder)
+    assert holder_in.wait(5)
+    t2 = start(queued)
+    wait_until(lambda: admission.stats()['waiting'] == 1)
+
+    with pytest.raises(Overloaded):
+        with admission:
+            pass
+
+    holder_out.set()
+    t1.join()
+    t2.join()
+    stats = admission.stats()
+    assert stats['admitted'] == 2
+    assert stats['queued'] == 1
+    assert stats['shed'] == 1
+
+
+def test_one_background_refresh_per_key():
+    # ttl=0이면 저장 직후부터 항상 stale 구간
+    cache = HotKeyCache(ttl=0, stale_ttl=60)
+    assert cache.get('A', lambda: 'old') == 'old'
+
+    load = BlockingLoader('new')
+    for _ in range(20):
+        assert cache.get('A', load) == 'old'
+    assert load.started.wait(5)
+
+    load.release()
+    wait_until(lambda: not cache._refreshing)
+
+    assert load.calls == 1
+    assert cache.stats()['stale_hits'] == 20
+    assert cache.get('A', load) == 'new'
+
+
+def test_none_result_is_not_cached():
+    cache = HotKeyCache(ttl=60)
+    assert cache.get('missing', lambda: None) is None
+    assert cache.stats()['entries'] == 0
+    assert cache.get('missing', lambda: 'created') == 'created'
+
+
+def test_generations_only_kept_while_loading():
+    cache = HotKeyCache(ttl=60)
+    for key in range(100):
+        cache.invalidate(key)
+    assert cache._generations == {}
+
+    load = BlockingLoader()
+    t = start(cache.get, 'A', load)
+    assert load.started.wait(5)
+    cache.invalidate('A')
+    assert 'A' in cache._generations
+
+    load.release()
+    t.join()
+    assert cache._generations == {}
+    assert cache._inflight == {}
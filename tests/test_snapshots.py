@@ -0,0 +1,119 @@
+import os
+import shutil
+import sqlite3
+import threading
+
+import pytest
+
+import app as app_module
+from app import DEV_SECRET_KEY, create_app, publish_snapshots
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def app(tmp_path):
+    db_path = tmp_path / 'playlist.db'
+    shutil.copy(os.path.join(ROOT, 'database', 'playlist.db'), db_path)
+    return create_app({
+        'SECRET_KEY': DEV_SECRET_KEY,
+        'DATABASE': str(db_path),
+        'SNAPSHOT_DIR': str(tmp_path / 'snapshots'),
+        'WARM_UP': False,
+    })
+
+
+def owned_playlist(app):
+    conn = sqlite3.connect(app.config['DATABASE'])
+    row = conn.execute("SELECT playlist_id, user_id FROM playlists LIMIT 1").fetchone()
+    conn.close()
+    return row
+
+
+def set_title(app, playlist_id, title):
+    conn = sqlite3.connect(app.config['DATABASE'])
+    conn.execute("UPDATE playlists SET title = ? WHERE playlist_id = ?", (title, playlist_id))
+    conn.commit()
+    conn.close()
+
+
+def read_snapshot(app, playlist_id):
+    publisher = app.extensions['snapshots']
+    with open(publisher.path(publisher.playlist_name(playlist_id)), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_later_edit_wins_when_publishes_overlap(app, monkeypatch):
+    playlist_id, _ = owned_playlist(app)
+    publisher = app.extensions['snapshots']
+    original_write = publisher.write
+    first_writing = threading.Event()
+    resume_first = threading.Event()
+
+    def slow_write(name, html):
+        # 먼저 시작한 게시(EDIT-ONE)를 파일 쓰기 직전에 붙잡아 둔다.
+        if 'EDIT-ONE' in html and not first_writing.is_set():
+            first_writing.set()
+            assert resume_first.wait(5)
+        original_write(name, html)
+
+    monkeypatch.setattr(publisher, 'write', slow_write)
+
+    def publish():
+        with app.app_context():
+            publish_snapshots([playlist_id])
+
+    set_title(app, playlist_id, 'EDIT-ONE')
+    first = threading.Thread(target=publish)
+    first.start()
+    assert first_writing.wait(5)
+
+    set_title(app, playlist_id, 'EDIT-TWO')
+    second = threading.Thread(target=publish)
+    second.start()
+    # 잠금이 없으면 두 번째 게시가 여기서 끝나 버리고, 첫 번째가 나중에 덮어쓴다.
+    second.join(timeout=0.5)
+    resume_first.set()
+    first.join()
+    second.join()
+
+    assert 'EDIT-TWO' in read_snapshot(app, playlist_id)
+
+
+def test_publish_failure_does_not_fail_save_and_is_rebuilt(app, monkeypatch):
+    playlist_id, user_id = owned_playlist(app)
+    publisher = app.extensions['snapshots']
+    original_write = publisher.write
+
+    def broken_write(name, html):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(publisher, 'write', broken_write)
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s['user_id'] = user_id
+    r = client.post(f'/playlists/edit/{playlist_id}',
+                    data={'action': 'save', 'title': 'SAVED', 'description': 'd'})
+    assert r.status_code == 302
+    assert publisher.is_dirty()
+
+    # 다음 게시는 다른 플레이리스트만 바꿔도 전체를 다시 만든다.
+    monkeypatch.setattr(publisher, 'write', original_write)
+    with app.app_context():
+        app_module.refresh_snapshots([])
+    assert 'SAVED' in read_snapshot(app, playlist_id)
+    assert not publisher.is_dirty()
+
+
+def test_restart_after_failed_publish_rebuilds(app, tmp_path):
+    playlist_id, _ = owned_playlist(app)
+    publisher = app.extensions['snapshots']
+
+    # 게시가 실패해 오래된 파일과 dirty 표시만 남은 채로 서버가 내려간 상황
+    set_title(app, playlist_id, 'AFTER-FAILURE')
+    publisher.mark_dirty()
+    assert 'AFTER-FAILURE' not in read_snapshot(app, playlist_id)
+
+    restarted = create_app(dict(app.config))
+    assert 'AFTER-FAILURE' in read_snapshot(restarted, playlist_id)
+    assert not restarted.extensions['snapshots'].is_dirty()
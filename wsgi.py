@@ -0,0 +1,17 @@
+"""
+운영용 WSGI 진입점
+
+    PLAYLIST_SECRET_KEY=... gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn.conf.py로 실행하면 preload_app + PLAYLIST_PRELOAD=1 이 되어
+마스터 프로세스에서 create_app()이 한 번만 실행되고(가드레일 + 템플릿 컴파일),
+워커들은 fork로 이를 물려받는다. 마스터는 SQLite 연결을 열어 두지 않으며,
+연결 워밍업은 워커의 post_fork에서 한다.
+
+설정 파일 없이(gunicorn wsgi:app) 실행하면 워커마다 이 모듈을 직접 불러오므로
+연결 워밍업까지 각 워커에서 바로 한다. (가드레일은 DB 쓰기 잠금으로 순서대로 실행됨)
+PLAYLIST_SECRET_KEY가 없으면 시작하지 않는다.
+"""
+from app import create_app
+
+app = create_app()